@@ -2,52 +2,408 @@ import os
 import streamlit as st
 from constant import Gemini_api, github_token# Gemini API key and github API key
 from urllib.parse import urlparse
+import aiohttp
 import requests
-from llama_index.core import VectorStoreIndex
+from llama_index.core import Document
+from llama_index.core import VectorStoreIndex, StorageContext, load_index_from_storage
 from llama_index.readers.github import GithubRepositoryReader, GithubClient
+import asyncio
 import nest_asyncio
 from llama_index.llms.gemini import Gemini
 from llama_index.core import Settings
 from llama_index.embeddings.gemini import GeminiEmbedding
-from llama_index.core.node_parser import TokenTextSplitter
-from llama_index.core import SummaryIndex
+import google.generativeai as genai
+from llama_index.core.node_parser import SentenceSplitter
 from llama_index.core.chat_engine.types import ChatMode
+import numpy as np
+from typing import Any
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.storage.storage_context import DEFAULT_VECTOR_STORE
+from llama_index.core.vector_stores import SimpleVectorStore
+from llama_index.core.vector_stores.types import VectorStoreQueryResult
+try:
+    import faiss
+    from llama_index.vector_stores.faiss import FaissVectorStore
+except ImportError:  # FAISS is optional; the quantized simple store is used instead
+    faiss = None
+import base64
+import collections
 import concurrent.futures
+import hashlib
+import itertools
+import pickle
+import re
 
-def load_documents(github_client, user, repo, excluded_dirs, branch):
-    """Function to load documents from the GitHub repository."""
-    return GithubRepositoryReader(
-        github_client=github_client,
+# Directories that are almost always generated/vendored and only inflate the
+# GitHub crawl; they are excluded in addition to whatever the user enters
+DEFAULT_EXCLUDED_DIRS = [
+    "node_modules",
+    ".git",
+    "dist",
+    "build",
+    ".venv",
+    "__pycache__",
+    "target",
+    "vendor",
+]
+
+# Dimensionality of models/embedding-001 vectors, needed to size the FAISS index
+EMBED_DIM = 768
+
+# Oldest chat entries are dropped past this point so history stays bounded
+MAX_CHAT_HISTORY = 50
+
+# Blobs above this size are skipped during the tree walk (minified bundles,
+# vendored assets, data dumps) so their contents are never downloaded
+MAX_BLOB_SIZE = 200_000
+
+# Generated files that slip past the directory/extension filters
+_GENERATED_PATH_RE = re.compile(
+    r"(^|/)(package-lock\.json|yarn\.lock|pnpm-lock\.yaml|poetry\.lock|Pipfile\.lock)$"
+    r"|\.(min\.js|min\.css|map|lock)$"
+)
+
+class FilteredGithubRepositoryReader(GithubRepositoryReader):
+    """GithubRepositoryReader that prunes oversized and generated blobs while
+    walking the tree, before any file contents are fetched."""
+
+    async def _recurse_tree(self, *args, **kwargs):
+        blobs_and_paths = await super()._recurse_tree(*args, **kwargs)
+        kept = []
+        for blob, path in blobs_and_paths:
+            if (getattr(blob, "size", 0) or 0) > MAX_BLOB_SIZE:
+                continue
+            if _GENERATED_PATH_RE.search(path):
+                continue
+            kept.append((blob, path))
+        return kept
+
+# On-disk store for text embeddings, keyed by sha256 of the chunk text
+EMBEDDING_CACHE_DIR = os.path.join(".cache", "embeddings")
+
+class CachedGeminiEmbedding(GeminiEmbedding):
+    """GeminiEmbedding with an on-disk cache keyed on the chunk's sha256.
+
+    Re-running on a slightly edited repo only sends the changed chunks to
+    the API; byte-identical chunks are read back from disk. Cache misses go
+    out as one batch request per call rather than one request per text.
+    """
+
+    def _cache_path(self, text):
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return os.path.join(EMBEDDING_CACHE_DIR, key[:2], key)
+
+    def _embed_batch(self, texts):
+        """Embed all texts with a single batchEmbedContents request.
+
+        The base class loops one embed_content call per text; passing the
+        whole list maps to the batch endpoint. Callers never pass more than
+        embed_batch_size (100) texts, the endpoint's per-request limit.
+        """
+        result = genai.embed_content(
+            model=self.model_name,
+            content=texts,
+            title=self.title,
+            task_type=self.task_type,
+        )
+        return result["embedding"]
+
+    def _get_text_embeddings(self, texts):
+        embeddings = [None] * len(texts)
+        misses = []
+        for i, text in enumerate(texts):
+            path = self._cache_path(text)
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    embeddings[i] = pickle.load(f)
+            else:
+                misses.append(i)
+        if misses:
+            fetched = self._embed_batch([texts[i] for i in misses])
+            for i, embedding in zip(misses, fetched):
+                path = self._cache_path(texts[i])
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    pickle.dump(embedding, f)
+                embeddings[i] = embedding
+        return embeddings
+
+# Static page chrome, built once at import instead of on every rerun
+HEADER_HTML = """
+    <div style="text-align: center;">
+        <h1>Github Repo Summarizer and Helper</h1>
+        <p>Created by <a href="https://github.com/ashishSharma222003" target="_blank">Ashish Sharma</a></p>
+    </div>
+    <div style="text-align: center;">
+        <p><strong>Description:</strong></p>
+        <p>This project is designed to summarize and provide insights into GitHub repositories. You can input a GitHub repository link, and the application will fetch and display relevant information about the repository, including its README content, recent commits, and more. It aims to help users quickly understand the purpose and recent activity of GitHub repositories.</p>
+    </div>
+    """
+
+@st.cache_data(show_spinner=False)
+def repo_table_html(user, repo, branch):
+    """Build the user/repo/branch summary table, cached per repo."""
+    return f"""
+        <div style="text-align: center; margin-bottom:10px">
+            <table style="margin: auto; border-collapse: collapse; width: 50%; border: 1px solid #ddd;">
+                <tr>
+                    <th style="border: 1px solid #ddd; padding: 8px;">User</th>
+                    <td style="border: 1px solid #ddd; padding: 8px;">{user}</td>
+                </tr>
+                <tr>
+                    <th style="border: 1px solid #ddd; padding: 8px;">Repository</th>
+                    <td style="border: 1px solid #ddd; padding: 8px;">{repo}</td>
+                </tr>
+                <tr>
+                    <th style="border: 1px solid #ddd; padding: 8px;">Branch</th>
+                    <td style="border: 1px solid #ddd; padding: 8px;">{branch}</td>
+                </tr>
+            </table>
+        </div>
+        """
+
+# Extensions skipped when deciding which blobs to download; frozen once at
+# module scope so per-file membership checks are O(1)
+_EXCLUDED_EXTS = frozenset({
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".svg",
+    ".ico",
+    ".pdf",
+    ".csv",
+    ".lock",
+    ".map",
+})
+
+def _keep_tree_entry(entry, excluded_dirs):
+    """Apply the directory, extension, size, and generated-file filters to a
+    single flat-tree entry."""
+    path = entry.get("path", "")
+    parts = path.split("/")
+    if any(part in excluded_dirs for part in parts[:-1]):
+        return False
+    if os.path.splitext(path)[1] in _EXCLUDED_EXTS:
+        return False
+    if (entry.get("size", 0) or 0) > MAX_BLOB_SIZE:
+        return False
+    if _GENERATED_PATH_RE.search(path):
+        return False
+    return True
+
+def list_repo_blobs(user, repo, branch):
+    """List every blob in the branch with a single recursive tree call.
+
+    One REST request returns the whole flat tree (paths, sizes, SHAs),
+    replacing the reader's one-request-per-directory walk. Raises if GitHub
+    truncated the listing, in which case the caller falls back to the
+    recursive reader.
+    """
+    response = _http_session.get(
+        f"https://api.github.com/repos/{user}/{repo}/git/trees/{branch}?recursive=1",
+        headers={"Authorization": f"token {github_token}"},
+        timeout=30,
+    )
+    response.raise_for_status()
+    payload = response.json()
+    if payload.get("truncated"):
+        raise RuntimeError("GitHub truncated the recursive tree listing")
+    return [entry for entry in payload["tree"] if entry.get("type") == "blob"]
+
+async def _fetch_blob_documents(user, repo, entries):
+    """Fetch the kept blobs concurrently and decode them into Documents.
+
+    Uses one pooled aiohttp session with a semaphore of 8 in-flight requests
+    to stay under GitHub's secondary rate limit; binary blobs that fail
+    UTF-8 decoding are dropped.
+    """
+    semaphore = asyncio.Semaphore(8)
+    headers = {"Authorization": f"token {github_token}"}
+    async with aiohttp.ClientSession(headers=headers) as session:
+        async def fetch(entry):
+            url = f"https://api.github.com/repos/{user}/{repo}/git/blobs/{entry['sha']}"
+            async with semaphore:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    data = await response.json()
+            try:
+                text = base64.b64decode(data.get("content", "")).decode("utf-8")
+            except (UnicodeDecodeError, ValueError):
+                return None
+            return Document(
+                text=text,
+                metadata={
+                    "file_path": entry["path"],
+                    "file_name": os.path.basename(entry["path"]),
+                },
+            )
+        documents = await asyncio.gather(*(fetch(entry) for entry in entries))
+    return [document for document in documents if document is not None]
+
+@st.cache_data(show_spinner=False, ttl=24 * 60 * 60, persist="disk")
+def load_documents(_github_client, user, repo, excluded_dirs, branch):
+    """Function to load documents from the GitHub repository.
+
+    Cached on (user, repo, branch, excluded_dirs) so reruns and new sessions
+    reuse the crawled documents instead of hitting the GitHub API again.
+    Lists the whole branch with one recursive tree request, filters the flat
+    list in Python, and fetches only the kept blobs concurrently; the
+    recursive reader walk remains as a fallback (e.g. truncated listings).
+    """
+    excluded_dirs = list(dict.fromkeys(list(excluded_dirs) + DEFAULT_EXCLUDED_DIRS))
+    try:
+        entries = list_repo_blobs(user, repo, branch)
+        entries = [entry for entry in entries if _keep_tree_entry(entry, excluded_dirs)]
+        return asyncio.run(_fetch_blob_documents(user, repo, entries))
+    except (requests.RequestException, aiohttp.ClientError, RuntimeError, KeyError):
+        pass
+    reader = FilteredGithubRepositoryReader(
+        github_client=_github_client,
         owner=user,
         repo=repo,
         use_parser=True,
         verbose=False,
+        concurrent_requests=8,
         filter_directories=(
             excluded_dirs,
             GithubRepositoryReader.FilterType.EXCLUDE,
         ),
         filter_file_extensions=(
-            [
-                ".png",
-                ".jpg",
-                ".jpeg",
-                ".gif",
-                ".svg",
-                ".ico",
-                ".pdf",
-                ".csv",
-            ],
+            _EXCLUDED_EXTS,
             GithubRepositoryReader.FilterType.EXCLUDE,
         )
-    ).load_data(branch=branch)
+    )
+    aload_data = getattr(reader, "aload_data", None)
+    if aload_data is not None:
+        return asyncio.run(aload_data(branch=branch))
+    return reader.load_data(branch=branch)
 
-def create_index(documents, transformations):
-    """Function to create a vector store index from documents."""
-    return VectorStoreIndex.from_documents(documents=documents, show_progress=True, transformations=transformations)
+@st.cache_resource(show_spinner=False)
+def init_settings():
+    """Configure env vars and the global llama-index Settings once per process.
 
-def create_summary(documents):
-    """Function to create a summary index from documents."""
-    return SummaryIndex.from_documents(documents=documents, show_progress=True)
+    Gemini() and the embedding model each open HTTP clients, so they should
+    not be rebuilt on every Streamlit rerun.
+    """
+    os.environ["GOOGLE_API_KEY"] = Gemini_api
+    os.environ["GITHUB_TOKEN"] = github_token
+    Settings.llm = Gemini()
+    model_name = "models/embedding-001"
+    # embed_batch_size=100 uses Gemini's batch endpoint (up to 100 texts per request)
+    Settings.embed_model = CachedGeminiEmbedding(model_name=model_name, api_key=Gemini_api, embed_batch_size=100)
+    return True
+
+def persist_dir_for(user, repo, branch, kind):
+    """Per-repo directory used to persist built indexes across restarts."""
+    return os.path.join(".cache", f"{user}__{repo}__{branch}", kind)
+
+@st.cache_resource(show_spinner=False, ttl=24 * 60 * 60)
+def split_documents(_documents, user, repo, branch, excluded_dirs):
+    """Function to split documents into nodes for the vector index.
+
+    Chunking is CPU-bound, so large document sets are split across a
+    process pool.
+    """
+    splitter = SentenceSplitter(chunk_size=512, chunk_overlap=128)
+    if len(_documents) < 32:
+        return splitter.get_nodes_from_documents(_documents, show_progress=True)
+    with concurrent.futures.ProcessPoolExecutor() as pool:
+        node_lists = pool.map(splitter.get_nodes_from_documents, [[doc] for doc in _documents], chunksize=16)
+        return list(itertools.chain.from_iterable(node_lists))
+
+class Int8SimpleVectorStore(SimpleVectorStore):
+    """SimpleVectorStore that keeps embeddings as an int8 matrix with one
+    scale per vector and scores top-k with an integer matrix product.
+
+    SimpleVectorStore is a pydantic model, so the quantized state lives in
+    private attributes and the query override is a real method rather than
+    an instance attribute (which pydantic rejects).
+    """
+
+    _node_ids: list = PrivateAttr(default_factory=list)
+    _quantized: Any = PrivateAttr(default=None)
+    _scales: Any = PrivateAttr(default=None)
+
+    @classmethod
+    def from_store(cls, store):
+        """Build a quantized store from a populated SimpleVectorStore."""
+        embedding_dict = store._data.embedding_dict
+        node_ids = list(embedding_dict)
+        matrix = np.asarray([embedding_dict[node_id] for node_id in node_ids], dtype=np.float32)
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized_store = cls(data=store._data)
+        quantized_store._node_ids = node_ids
+        quantized_store._quantized = np.round(matrix / scales[:, None]).astype(np.int8)
+        quantized_store._scales = scales
+        # Free the FP32 copies; retrieval reads the int8 matrix
+        store._data.embedding_dict = {}
+        return quantized_store
+
+    def query(self, query, **kwargs):
+        if self._quantized is None:
+            return super().query(query, **kwargs)
+        query_embedding = np.asarray(query.query_embedding, dtype=np.float32)
+        query_scale = max(np.abs(query_embedding).max() / 127.0, 1e-12)
+        query_int8 = np.round(query_embedding / query_scale).astype(np.int8)
+        similarities = (self._quantized.astype(np.int32) @ query_int8.astype(np.int32)) * self._scales * query_scale
+        top_k = min(query.similarity_top_k, len(self._node_ids))
+        top = np.argpartition(similarities, -top_k)[-top_k:]
+        top = top[np.argsort(similarities[top])[::-1]]
+        return VectorStoreQueryResult(
+            similarities=[float(similarities[i]) for i in top],
+            ids=[self._node_ids[i] for i in top],
+        )
+
+def quantize_vector_store(index):
+    """Swap the index's simple vector store for an int8-quantized copy.
+
+    Cuts resident embedding memory ~4x and lets top-k scoring run as one
+    integer matrix product rescaled by the two scales. Runs after the index
+    is persisted, so the on-disk copy keeps full-precision floats. Only a
+    populated SimpleVectorStore is swapped; anything else is left untouched.
+    """
+    store = index.vector_store
+    if isinstance(store, Int8SimpleVectorStore) or not isinstance(store, SimpleVectorStore):
+        return
+    if not store._data.embedding_dict:
+        return
+    quantized_store = Int8SimpleVectorStore.from_store(store)
+    index._vector_store = quantized_store
+    index.storage_context.vector_stores[DEFAULT_VECTOR_STORE] = quantized_store
+
+@st.cache_resource(show_spinner=False, ttl=24 * 60 * 60)
+def create_index(_nodes, user, repo, branch, excluded_dirs):
+    """Function to create a vector store index from pre-split nodes.
+
+    Cached on (user, repo, branch, excluded_dirs) so the embeddings are only
+    generated once per repository, and persisted to disk so a process
+    restart reloads the index instead of re-embedding. Retrieval runs on a
+    FAISS inner-product index when faiss is installed (SIMD top-k instead of
+    a Python scan); otherwise the simple store is used and its in-memory
+    copy is quantized to int8 after persisting.
+    """
+    if faiss is not None:
+        persist_dir = persist_dir_for(user, repo, branch, "vec_faiss")
+        if os.path.isdir(persist_dir):
+            vector_store = FaissVectorStore.from_persist_dir(persist_dir)
+            storage_context = StorageContext.from_defaults(vector_store=vector_store, persist_dir=persist_dir)
+            return load_index_from_storage(storage_context)
+        vector_store = FaissVectorStore(faiss_index=faiss.IndexFlatIP(EMBED_DIM))
+        storage_context = StorageContext.from_defaults(vector_store=vector_store)
+        index = VectorStoreIndex(nodes=_nodes, storage_context=storage_context, show_progress=True, insert_batch_size=2048)
+        index.storage_context.persist(persist_dir=persist_dir)
+        return index
+    persist_dir = persist_dir_for(user, repo, branch, "vec")
+    if os.path.isdir(persist_dir):
+        index = load_index_from_storage(StorageContext.from_defaults(persist_dir=persist_dir))
+        quantize_vector_store(index)
+        return index
+    index = VectorStoreIndex(nodes=_nodes, show_progress=True, insert_batch_size=2048)
+    index.storage_context.persist(persist_dir=persist_dir)
+    quantize_vector_store(index)
+    return index
 
 def extract_github_details(url):
     """Extract the GitHub username and repository name from the URL."""
@@ -65,181 +421,117 @@ def is_valid_github_url(url):
             parsed_url.netloc == "github.com" and
             parsed_url.path.startswith("/"))
 
+_http_session = requests.Session()
+
+@st.cache_data(ttl=300, show_spinner=False)
 def check_github_repo_exists(url):
-    """Check if the GitHub repository exists."""
+    """Check if the GitHub repository exists.
+
+    Uses a HEAD request against the REST API (no response body to download)
+    over a shared session so the connection is reused, and caches the result
+    so reruns on the same URL skip the network entirely.
+    """
     try:
         path = urlparse(url).path.strip("/")
         user, repo = path.split("/", 1)
-        api_url = f"https://github.com/{user}/{repo}"
-        response = requests.get(api_url)
+        api_url = f"https://api.github.com/repos/{user}/{repo}"
+        response = _http_session.head(
+            api_url,
+            headers={"Authorization": f"token {github_token}"},
+            timeout=5,
+        )
         return response.status_code == 200
     except ValueError:
         return False
 
 def main():
     nest_asyncio.apply()
-    st.markdown(
-    """
-    <div style="text-align: center;">
-        <h1>Github Repo Summarizer and Helper</h1>
-        <p>Created by <a href="https://github.com/ashishSharma222003" target="_blank">Ashish Sharma</a></p>
-    </div>
-    """,
-    unsafe_allow_html=True
-    )
-    st.markdown(
-    """
-    <div style="text-align: center;">
-        <p><strong>Description:</strong></p>
-        <p>This project is designed to summarize and provide insights into GitHub repositories. You can input a GitHub repository link, and the application will fetch and display relevant information about the repository, including its README content, recent commits, and more. It aims to help users quickly understand the purpose and recent activity of GitHub repositories.</p>
-    </div>
-    """,
-    unsafe_allow_html=True
-)
+    st.markdown(HEADER_HTML, unsafe_allow_html=True)
     st.divider()
     
-    try:
-        os.environ["GOOGLE_API_KEY"] = Gemini_api
-    except ValueError as e:
+    if not Gemini_api:
         st.error("Google API key is not set.")
         return
-    
-    try:
-        os.environ["GITHUB_TOKEN"] = github_token
-    except ValueError as e:
+    if not github_token:
         st.error("GitHub Token API key is not set.")
         return
-    
-    Settings.llm = Gemini()
-    model_name = "models/embedding-001"
-    Settings.embed_model = GeminiEmbedding(model_name=model_name, api_key=Gemini_api)
-    
+    init_settings()
+
     # Initialize session state if not already present
     if 'github_client' not in st.session_state:
         st.session_state.github_client = None
         st.session_state.index = None
-        st.session_state.summary = None
         st.session_state.query_engine = None
-        st.session_state.summary_query_engine = None
-        st.session_state.chat_history = []
-    
-    # Input for GitHub repo link
+        st.session_state.chat_history = collections.deque(maxlen=MAX_CHAT_HISTORY)
+        st.session_state.repo_details = None
+
+    # Input for GitHub repo link; nothing is validated or fetched until the
+    # button is pressed, so typing does not trigger network calls per keystroke
     github_repo_link = st.text_input(label="Enter GitHub Repo Link:", placeholder="https://github.com/UserName/repo-name")
-    
-    if github_repo_link:
-        if not is_valid_github_url(github_repo_link):
+    branch = st.text_input(label="Enter the branch you need to search:", placeholder="main")
+    exclude_dirs = st.checkbox("Exclude specific directories")
+    excluded_dirs = []
+    if exclude_dirs:
+        excluded_dirs_input = st.text_input(
+            label="Enter directories to exclude (comma-separated, optional):",
+            placeholder="dir1, dir2, dir3"
+        )
+        if excluded_dirs_input:
+            excluded_dirs = [dir.strip() for dir in excluded_dirs_input.split(',')]
+
+    if st.button("Load repository"):
+        if not github_repo_link or not is_valid_github_url(github_repo_link):
             st.error("The URL format is incorrect. Please enter a valid GitHub repository URL.")
+        elif not branch:
+            st.error("Please enter the branch you need to search.")
+        elif not check_github_repo_exists(github_repo_link):
+            st.error("The GitHub repository does not exist or the URL is incorrect.")
         else:
-            if check_github_repo_exists(github_repo_link):
-                if st.session_state.github_client is None:
-                    st.session_state.github_client = GithubClient(github_token=github_token, verbose=True)
-                
-                user, repo = extract_github_details(github_repo_link)
-                branch = st.text_input(label="Enter the branch you need to search:", placeholder="main")
-
-                if branch:
-                    st.markdown(
-                    f"""
-                    <div style="text-align: center; margin-bottom:10px">
-                        <table style="margin: auto; border-collapse: collapse; width: 50%; border: 1px solid #ddd;">
-                            <tr>
-                                <th style="border: 1px solid #ddd; padding: 8px;">User</th>
-                                <td style="border: 1px solid #ddd; padding: 8px;">{user}</td>
-                            </tr>
-                            <tr>
-                                <th style="border: 1px solid #ddd; padding: 8px;">Repository</th>
-                                <td style="border: 1px solid #ddd; padding: 8px;">{repo}</td>
-                            </tr>
-                            <tr>
-                                <th style="border: 1px solid #ddd; padding: 8px;">Branch</th>
-                                <td style="border: 1px solid #ddd; padding: 8px;">{branch}</td>
-                            </tr>
-                        </table>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                    )
-                
-                exclude_dirs = st.checkbox("Exclude specific directories")
-                excluded_dirs = []
-                if exclude_dirs:
-                    excluded_dirs_input = st.text_input(
-                        label="Enter directories to exclude (comma-separated, optional):",
-                        placeholder="dir1, dir2, dir3"
-                    )
-                    if excluded_dirs_input:
-                        excluded_dirs = [dir.strip() for dir in excluded_dirs_input.split(',')]
-
-                transformations = [
-                    TokenTextSplitter(chunk_size=512, chunk_overlap=128),
-                ]
-                
-                # Process data if not already processed
-                if st.session_state.index is None or st.session_state.summary is None:
-                    st.write("Please wait while the data is being processed...")
-                    with st.spinner("Loading documents, creating index, and generating summary...."):
-                        with concurrent.futures.ThreadPoolExecutor() as executor:
-                            future_documents = executor.submit(load_documents, st.session_state.github_client, user, repo, excluded_dirs, branch)
-                            documents = future_documents.result()
-                            future_index = executor.submit(create_index, documents, transformations)
-                            future_summary = executor.submit(create_summary, documents)
-                            st.session_state.index = future_index.result()
-                            st.session_state.summary = future_summary.result()
-                
-                if st.session_state.query_engine is None:
-                    st.session_state.query_engine = st.session_state.index.as_chat_engine(chat_mode=ChatMode.CONTEXT)
-                if st.session_state.summary_query_engine is None:
-                    st.session_state.summary_query_engine = st.session_state.summary.as_chat_engine(chat_mode=ChatMode.CONTEXT)
-                
-                st.markdown(
-                    """
-                    <style>
-                    .full-width {
-                        display: flex;
-                        flex-direction: column;
-                        width: 100%;
-                    }
-                    .full-width > div {
-                        flex: 1;
-                        padding: 10px;
-                    }
-                    </style>
-                    """,
-                    unsafe_allow_html=True
-                )
-
-                # Display chat history
-                for entry in st.session_state.chat_history:
-                    with st.container():
-                        st.write(f"**User:** {entry['question']}")
-                        st.markdown('<div class="full-width">', unsafe_allow_html=True)
-                        # st.write("Summary Response:", unsafe_allow_html=True)
-                        # st.write(entry['summary_response'], unsafe_allow_html=True)
-                        st.write("Chat Response:", unsafe_allow_html=True)
-                        st.write(entry['achat_response'], unsafe_allow_html=True)
-                        st.markdown('</div>', unsafe_allow_html=True)
-
-                # Input for the user's question
-                question = st.text_area(label="Write Your Question Here About The Code", key="question_input")
-
-                if st.button("Submit Question"):
-                    if question:
-                        with concurrent.futures.ThreadPoolExecutor() as executor:
-                            future_summary = executor.submit(st.session_state.summary_query_engine.query, question)
-                            future_achat = executor.submit(st.session_state.query_engine.chat, question)
-
-                            summary_response = future_summary.result()
-                            achat_response = future_achat.result()
-
-                        st.session_state.chat_history.append({
-                            'question': question,
-                            # 'summary_response': str(summary_response.response[0]),
-                            'achat_response': str(achat_response.response)
-                        })
-                        # st.session_state.question_input = ""
-                
-            else:
-                st.error("The GitHub repository does not exist or the URL is incorrect.")
+            user, repo = extract_github_details(github_repo_link)
+            st.session_state.repo_details = (user, repo, branch, tuple(excluded_dirs))
+            # A new repo needs a fresh engine and a fresh conversation
+            st.session_state.query_engine = None
+            st.session_state.chat_history = collections.deque(maxlen=MAX_CHAT_HISTORY)
+
+    if st.session_state.repo_details:
+        user, repo, branch, excluded_dirs = st.session_state.repo_details
+        if st.session_state.github_client is None:
+            st.session_state.github_client = GithubClient(github_token=github_token, verbose=True)
+
+        st.markdown(repo_table_html(user, repo, branch), unsafe_allow_html=True)
+
+        # Process data; the cached helpers make this a no-op on reruns
+        with st.spinner("Loading documents and creating index...."):
+            documents = load_documents(st.session_state.github_client, user, repo, excluded_dirs, branch)
+            nodes = split_documents(documents, user, repo, branch, excluded_dirs)
+            st.session_state.index = create_index(nodes, user, repo, branch, excluded_dirs)
+
+        if st.session_state.query_engine is None:
+            st.session_state.query_engine = st.session_state.index.as_chat_engine(chat_mode=ChatMode.CONTEXT)
+        # Display chat history with the native chat primitives, which diff
+        # efficiently instead of rebuilding custom HTML for every entry
+        for entry in st.session_state.chat_history:
+            with st.chat_message("user"):
+                st.write(entry['question'])
+            with st.chat_message("assistant"):
+                st.write(entry['achat_response'])
+
+        # chat_input only triggers a rerun on submit, not on every keystroke
+        question = st.chat_input("Write Your Question Here About The Code")
+
+        if question:
+            with st.chat_message("user"):
+                st.write(question)
+            # Stream tokens as Gemini produces them instead of blocking until
+            # the full response is assembled
+            response_stream = st.session_state.query_engine.stream_chat(question)
+            with st.chat_message("assistant"):
+                achat_text = st.write_stream(response_stream.response_gen)
+
+            st.session_state.chat_history.append({
+                'question': question,
+                'achat_response': str(achat_text)
+            })
 
 if __name__ == "__main__":
     main()